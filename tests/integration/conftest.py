@@ -9,6 +9,9 @@ from typing import Any
 
 import pytest
 import pytest_asyncio
+from github import Github
+from github.Auth import Token
+from github.Repository import Repository
 from juju.application import Application
 from juju.model import Model
 from pytest_operator.plugin import OpsTest
@@ -53,7 +56,7 @@ def flask_app_image_fixture(pytestconfig: pytest.Config) -> str | None:
     return flask_app_image
 
 
-@pytest.fixture(name="github_token", scope="module")
+@pytest.fixture(name="github_token", scope="session")
 def github_token_fixture(pytestconfig: pytest.Config) -> str | None:
     """Return the github token secret"""
     github_token = pytestconfig.getoption(GITHUB_TOKEN_PARAM) or os.getenv(GITHUB_TOKEN_ENV_VAR)
@@ -120,13 +123,29 @@ def github_auth_fixture(
     )
 
 
-@pytest.fixture(name="test_repo", scope="module")
+@pytest.fixture(name="test_repo", scope="session")
 def test_repo_fixture(pytestconfig: pytest.Config) -> str | None:
     """Return the github test repository"""
     test_repo = pytestconfig.getoption(WEBHOOK_TEST_REPOSITORY_PARAM)
     return test_repo
 
 
+@pytest.fixture(name="github_client", scope="session")
+def github_client_fixture(github_token: str) -> Github:
+    """Create a github client shared by all test modules.
+
+    The connection pool of the client is reused by all requests, including raw requests
+    done with the requester of the client.
+    """
+    return Github(auth=Token(github_token), pool_size=10)
+
+
+@pytest.fixture(name="repo", scope="session")
+def repo_fixture(github_client: Github, test_repo: str) -> Repository:
+    """Create a repository object for the test repo."""
+    return github_client.get_repo(test_repo)
+
+
 @pytest.fixture(name="model", scope="module")
 def model_fixture(ops_test: OpsTest) -> Model:
     """Juju model used in the test."""
@@ -2,17 +2,19 @@
 #  See LICENSE file for licensing details.
 """Integration tests for the webhook redelivery script."""
 
+import itertools
+import logging
+import random
 import secrets
-from asyncio import sleep
+from asyncio import gather, sleep, to_thread
+from collections import namedtuple
 from datetime import datetime, timezone
-from typing import Callable, Iterator
+from typing import Any, Callable, Iterator
 from uuid import uuid4
 
 import pytest
 from github import Github
-from github.Auth import Token
 from github.Hook import Hook
-from github.HookDelivery import HookDeliverySummary
 from github.Repository import Repository
 from github.Workflow import Workflow
 from juju.action import Action
@@ -33,14 +35,48 @@ GITHUB_TOKEN_SECRET_ID_PARAM_NAME = "github-token-secret-id"  # nosec this is no
 
 TEST_WORKFLOW_DISPATCH_FILE = "webhook_redelivery_test.yaml"
 
+logger = logging.getLogger(__name__)
+
+# The latest page of hook deliveries together with the ETag GitHub returned for it.
+_DeliveriesPage = namedtuple("_DeliveriesPage", ["etag", "deliveries"])
+
+_AUTH_ERROR_CASES = (
+    pytest.param(
+        "123",
+        446,
+        "private",
+        "token",
+        "Github auth details are specified in two ways. "
+        "Please specify only one of github token or github app auth details.",
+        id="github app config and github token secret",
+    ),
+    pytest.param(
+        None,
+        None,
+        None,
+        None,
+        "Github auth details are not specified completely."
+        " Am missing github token or complete set of app auth parameters.",
+        id="no github app config or github token",
+    ),
+    pytest.param(
+        "eda",
+        123,
+        None,
+        None,
+        "Github auth details are not specified completely."
+        " Am missing github token or complete set of app auth parameters.",
+        id="not all github app config provided",
+    ),
+)
 
-@pytest.fixture(name="repo", scope="module")
-def repo_fixture(github_token: str, test_repo: str) -> Repository:
-    """Create a repository object for the test repo."""
-    github = Github(auth=Token(github_token))
-    repo = github.get_repo(test_repo)
 
-    return repo
+@pytest.fixture(name="log_rate_limit")
+def log_rate_limit_fixture(github_client: Github) -> Iterator[None]:
+    """Log the remaining Github API rate limit before and after the test."""
+    logger.info("Github API rate limit remaining before: %s", github_client.rate_limiting[0])
+    yield
+    logger.info("Github API rate limit remaining after: %s", github_client.rate_limiting[0])
 
 
 @pytest.fixture(name="hook")
@@ -51,7 +87,7 @@ def hook_fixture(repo: Repository) -> Iterator["Hook"]:
     """
     # we need a unique url to distinguish this webhook from others
     # the ip is internal and the webhook delivery is expected to fail
-    unique_url = f"http://192.168.0.1:8080/{uuid4().hex}"
+    unique_url = f"http://192.168.0.1:8080/{uuid4().hex[:8]}"
     hook = repo.create_hook(
         name="web",
         events=["workflow_job"],
@@ -74,6 +110,7 @@ def test_workflow_fixture(repo: Repository) -> Iterator[Workflow]:
         run.cancel()
 
 
+@pytest.mark.usefixtures("log_rate_limit")
 async def test_webhook_redelivery(
     router: Application,
     github_auth: GithubAuthenticationMethodParams,
@@ -88,8 +125,15 @@ async def test_webhook_redelivery(
     """
     unit = router.units[0]
 
+    # we need to dispatch a job in order to have a webhook delivery with event "workflow_job",
+    # the dispatch is done in a thread to overlap it with the secret creation
+    dispatched, (secret_name, secret_id) = await gather(
+        to_thread(test_workflow.create_dispatch, "main"),
+        _add_secret(router, _get_secret_data_for_github_auth(github_auth)),
+    )
+    assert dispatched
+
     action_parms = {"webhook-id": hook.id, "since": 600, "github-path": repo.full_name}
-    secret_id = await _create_secret_for_github_auth(router, github_auth)
     if github_auth.token:
         action_parms["github-token-secret-id"] = secret_id
     else:
@@ -98,23 +142,15 @@ async def test_webhook_redelivery(
             GITHUB_APP_CLIENT_ID_PARAM_NAME: github_auth.client_id,
             GITHUB_APP_INSTALLATION_ID_PARAM_NAME: github_auth.installation_id,
         }
-    # we need to dispatch a job in order to have a webhook delivery with event "workflow_job"
-    assert test_workflow.create_dispatch(ref="main")
-
-    async def _wait_for_delivery_condition(
-        condition: Callable[[HookDeliverySummary], bool], condition_title: str
-    ) -> None:
-        """Wait to find a certain delivery with the condition."""
-        for _ in range(10):
-            deliveries = repo.get_hook_deliveries(hook.id)
-            for delivery in deliveries:
-                if condition(delivery):
-                    return
-            await sleep(1)
-        assert False, f"Did not receive a webhook who fits the condition '{condition_title}'"
-
-    await _wait_for_delivery_condition(
-        lambda d: d.event == "workflow_job", "event is workflow_job"
+    # the secret grant is only required by the action, so it overlaps with the delivery polling
+    _, deliveries_page = await gather(
+        router.model.grant_secret(secret_name, router.name),
+        _wait_for_delivery_condition(
+            repo=repo,
+            hook_id=hook.id,
+            condition=lambda d: d["event"] == "workflow_job",
+            condition_title="event is workflow_job",
+        ),
     )
 
     action: Action = await unit.run_action("redeliver-failed-webhooks", **action_parms)
@@ -125,8 +161,11 @@ async def test_webhook_redelivery(
         action.results.get("redelivered") == "1"
     ), f"redelivered not matching in {action.results}"
     await _wait_for_delivery_condition(
-        lambda d: d.event == "workflow_job" and bool(d.redelivery),
-        "delivery with event workflow_job has been redelivered",
+        repo=repo,
+        hook_id=hook.id,
+        condition=lambda d: d["event"] == "workflow_job" and bool(d["redelivery"]),
+        condition_title="delivery with event workflow_job has been redelivered",
+        deliveries_page=deliveries_page,
     )
 
 
@@ -134,35 +173,7 @@ async def test_webhook_redelivery(
     "github_app_client_id, github_app_installation_id, "
     "github_app_private_key_secret, github_token_secret,"
     "expected_message",
-    [
-        pytest.param(
-            "123",
-            446,
-            "private",
-            "token",
-            "Github auth details are specified in two ways. "
-            "Please specify only one of github token or github app auth details.",
-            id="github app config and github token secret",
-        ),
-        pytest.param(
-            None,
-            None,
-            None,
-            None,
-            "Github auth details are not specified completely."
-            " Am missing github token or complete set of app auth parameters.",
-            id="no github app config or github token",
-        ),
-        pytest.param(
-            "eda",
-            123,
-            None,
-            None,
-            "Github auth details are not specified completely."
-            " Am missing github token or complete set of app auth parameters.",
-            id="not all github app config provided",
-        ),
-    ],
+    _AUTH_ERROR_CASES,
 )  # we use a lot of arguments, but it seems not worth to introduce a capsulating object for this
 async def test_action_github_auth_param_error(
     # pylint: disable=too-many-arguments,too-many-positional-arguments
@@ -292,24 +303,109 @@ async def test_secret_key_missing(
     assert expected_message in action_msg
 
 
-async def _create_secret_for_github_auth(
-    app: Application, github_auth: GithubAuthenticationMethodParams
-) -> str:
-    """Create a secret with appropriate key depending on the Github auth type."""
-    if github_auth.token:
-        secret_data = [f"token={github_auth.token}"]
-    else:
-        secret_data = [f"private-key={github_auth.private_key}"]
+async def _wait_for_delivery_condition(
+    repo: Repository,
+    hook_id: int,
+    condition: Callable[[dict[str, Any]], bool],
+    condition_title: str,
+    deliveries_page: _DeliveriesPage | None = None,
+) -> _DeliveriesPage:
+    """Wait to find a certain delivery with the condition.
+
+    Returns:
+        The last page of deliveries fetched, to be passed to subsequent waits.
+    """
+    last_seen_id = 0
+
+    def _delivery_found() -> bool:
+        """Fetch the latest deliveries and check the new ones for the condition."""
+        nonlocal deliveries_page, last_seen_id
+        deliveries_page = _get_hook_deliveries(repo, hook_id, deliveries_page)
+        # deliveries are ordered from newest to oldest, so only the deliveries newer than the
+        # ones checked in the previous poll have to be checked
+        new_deliveries = itertools.takewhile(
+            lambda d: d["id"] > last_seen_id, deliveries_page.deliveries
+        )
+        if any(condition(delivery) for delivery in new_deliveries):
+            return True
+        if deliveries_page.deliveries:
+            last_seen_id = deliveries_page.deliveries[0]["id"]
+        return False
+
+    if not await _poll_until(_delivery_found):
+        pytest.fail(f"Did not receive a webhook who fits the condition '{condition_title}'")
+    # mypy does not understand that the page is set by the first poll
+    assert deliveries_page is not None  # nosec
+    return deliveries_page
+
+
+async def _poll_until(
+    predicate: Callable[[], bool], *, attempts: int = 8, base: float = 0.25, cap: float = 5.0
+) -> bool:
+    """Call the predicate in a thread with exponential backoff until it returns True.
+
+    Args:
+        predicate: The predicate to call.
+        attempts: The maximum number of calls.
+        base: The delay in seconds after the first call, doubled after every call.
+        cap: The maximum delay in seconds between two calls.
+
+    Returns:
+        True if the predicate returned True within the attempts, otherwise False.
+    """
+    for attempt in range(attempts):
+        # the predicate performs blocking requests, so it runs in a thread to not block the loop
+        if await to_thread(predicate):
+            return True
+        if attempt < attempts - 1:
+            # We do not use random for cryptographic purposes, the jitter only spreads the polls.
+            await sleep(min(cap, base * 2**attempt) + random.uniform(0, 0.1))  # nosec
+    return False
+
+
+def _get_hook_deliveries(
+    repo: Repository, hook_id: int, deliveries_page: _DeliveriesPage | None
+) -> _DeliveriesPage:
+    """Get the latest page of hook deliveries.
+
+    A conditional request is used if a previous page is given, so that an unchanged page
+    results in a 304 response, which does not count against the primary rate limit.
+    """
+    # pygithub does not support conditional requests for paginated lists, so we have to use
+    # the requester directly to perform a raw request
+    headers = {"If-None-Match": deliveries_page.etag} if deliveries_page else {}
+    response_headers, deliveries = repo.requester.requestJsonAndCheck(
+        "GET", f"/repos/{repo.full_name}/hooks/{hook_id}/deliveries", headers=headers
+    )
+    # the body of a 304 response is empty
+    if deliveries is None and deliveries_page is not None:
+        return deliveries_page
+    return _DeliveriesPage(etag=response_headers.get("etag"), deliveries=deliveries)
 
-    return await _create_secret(app, secret_data)
 
+def _get_secret_data_for_github_auth(github_auth: GithubAuthenticationMethodParams) -> list[str]:
+    """Get the secret data with appropriate key depending on the Github auth type."""
+    if github_auth.token:
+        return [f"token={github_auth.token}"]
+    return [f"private-key={github_auth.private_key}"]
 
-async def _create_secret(app: Application, secret_data: list[str]) -> str:
-    """Create a secret with the given data."""
-    secret_name = f"secret-{uuid4().hex}"
-    secret = await app.model.add_secret(secret_name, secret_data)
-    secret_id = secret.split(":")[-1]
 
+async def _create_secret(app: Application, secret_data: list[str]) -> str:
+    """Create a secret with the given data and grant it to the application."""
+    secret_name, secret_id = await _add_secret(app, secret_data)
     await app.model.grant_secret(secret_name, app.name)
 
     return secret_id
+
+
+async def _add_secret(app: Application, secret_data: list[str]) -> tuple[str, str]:
+    """Add a secret with the given data to the model without granting it.
+
+    Returns:
+        The name and the id of the secret.
+    """
+    secret_name = f"secret-{uuid4().hex[:8]}"
+    secret = await app.model.add_secret(secret_name, secret_data)
+    secret_id = secret.split(":")[-1]
+
+    return secret_name, secret_id
@@ -0,0 +1,66 @@
+#  Copyright 2025 Canonical Ltd.
+#  See LICENSE file for licensing details.
+
+"""Fixtures for the unit tests."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from flask import Flask
+
+import webhook_router.app as app_module
+import webhook_router.router
+from webhook_router.router import RoutingTable
+
+FLAVOURS_YAML = """
+- small:
+  - x64
+  - small
+- large:
+    - arm64
+    - large
+"""
+
+
+@pytest.fixture(name="flavours_yaml", scope="session")
+def flavours_yaml_fixture() -> str:
+    """Return the flavours yaml."""
+    return FLAVOURS_YAML
+
+
+@pytest.fixture(name="route_table", scope="session")
+def route_table_fixture() -> RoutingTable:
+    """Create a route table."""
+    return RoutingTable(
+        value={
+            ("arm64",): "large",
+            ("large",): "large",
+            ("arm64", "large"): "large",
+            ("x64",): "small",
+            ("small",): "small",
+            ("small", "x64"): "small",
+        },
+        default_flavor="small",
+    )
+
+
+@pytest.fixture(name="app", scope="session")
+def app_fixture(flavours_yaml: str, route_table: RoutingTable) -> Flask:
+    """Setup the flask app once for the test session.
+
+    Setup testing mode and configure the app with the test flavours.
+    """
+    app_module.app.config.update(
+        {
+            "TESTING": True,
+            "FLAVOURS": flavours_yaml,
+            "DEFAULT_SELF_HOSTED_LABELS": "self-hosted,linux",
+            "DEFAULT_FLAVOUR": "small",
+        }
+    )
+    # the routing table only needs to be mocked while configuring the app
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        mock = MagicMock(spec=webhook_router.router.to_routing_table, return_value=route_table)
+        monkeypatch.setattr("webhook_router.app.to_routing_table", mock)
+        app_module.config_app(app_module.app)
+    return app_module.app
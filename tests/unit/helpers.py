@@ -3,7 +3,6 @@
 
 """Helper functions for the unit tests."""
 
-import hashlib
 import hmac
 
 
@@ -17,8 +16,7 @@ def create_correct_signature(secret: str, payload: bytes) -> str:
     Returns:
         The correct signature.
     """
-    hash_object = hmac.new(secret.encode("utf-8"), msg=payload, digestmod=hashlib.sha256)
-    return "sha256=" + hash_object.hexdigest()
+    return "sha256=" + hmac.digest(secret.encode("utf-8"), payload, "sha256").hex()
 
 
 def create_incorrect_signature(secret: str, payload: bytes) -> str:
@@ -3,9 +3,8 @@
 
 """The unit tests for the  flask app."""
 
+import functools
 import json
-import secrets
-from typing import Callable, Iterator
 from unittest.mock import MagicMock
 
 import pytest
@@ -14,80 +13,74 @@ from flask.testing import FlaskClient
 from werkzeug.exceptions import BadRequest, UnsupportedMediaType
 
 import webhook_router.app as app_module
-import webhook_router.router
 from tests.unit.helpers import create_correct_signature, create_incorrect_signature
 from webhook_router.parse import Job, JobStatus, ParseError
 from webhook_router.router import RouterError, RoutingTable
 
 TEST_PATH = "/webhook"
+BAD_REQUEST = BadRequest.code
+UNSUPPORTED_MEDIA_TYPE = UnsupportedMediaType.code
 TEST_LABELS = ["self-hosted", "linux", "arm64"]
 DEFAULT_SELF_HOSTED_LABELS = {"self-hosted", "linux"}
-
-
-@pytest.fixture(name="flavours_yaml")
-def flavours_yaml_fixture() -> str:
-    """Create a flavours yaml file."""
-    flavours_yaml = """
-- small:
-  - x64
-  - small
-- large:
-    - arm64
-    - large
-"""
-    return str(flavours_yaml)
-
-
-@pytest.fixture(name="client")
-def client_fixture(app: Flask) -> FlaskClient:
-    """Create the flask test client."""
-    return app.test_client()
-
-
-@pytest.fixture(name="route_table")
-def route_table_fixture() -> RoutingTable:
-    """Create a route table."""
-    return RoutingTable(
-        value={
-            ("arm64",): "large",
-            ("large",): "large",
-            ("arm64", "large"): "large",
-            ("x64",): "small",
-            ("small",): "small",
-            ("small", "x64"): "small",
-        },
-        default_flavor="small",
+EXPECTED_LABELS = frozenset(TEST_LABELS) - DEFAULT_SELF_HOSTED_LABELS
+# The workflow job is shared by all valid payloads, the tests must not modify it.
+VALID_WORKFLOW_JOB = {
+    "id": 123456789,
+    "run_id": 987654321,
+    "status": "completed",
+    "conclusion": "success",
+    "labels": TEST_LABELS,
+    "url": "https://api.github.com/repos/f/actions/jobs/8200803099",
+}
+EXPECTED_JOB = Job(
+    labels=EXPECTED_LABELS,
+    status=JobStatus.QUEUED,
+    url=VALID_WORKFLOW_JOB["url"],  # type: ignore
+)
+# The supported event header as WSGI environ entry, to avoid building a header map per request.
+GITHUB_EVENT_ENVIRON = {
+    f"HTTP_{app_module.GITHUB_EVENT_HEADER.upper().replace('-', '_')}": (
+        app_module.SUPPORTED_GITHUB_EVENT
     )
+}
+# The payload and the signatures of it are computed once at collection time.
+VALID_PAYLOAD = json.dumps(
+    {"action": "queued", "workflow_job": VALID_WORKFLOW_JOB},
+).encode("utf-8")
+OTHER_PAYLOAD = json.dumps({"test": "data"}).encode("utf-8")
+WEBHOOK_SECRET = "test-webhook-secret"  # nosec this is no hardcoded password
+VALIDATION_HEADERS = {
+    "Content-Type": "application/json",
+    app_module.GITHUB_EVENT_HEADER: app_module.SUPPORTED_GITHUB_EVENT,
+}
+
+
+@pytest.fixture(name="client", scope="session")
+def client_fixture(app: Flask) -> FlaskClient:
+    """Create the flask test client once, it keeps no state between requests."""
+    return app.test_client(use_cookies=False)
 
 
 @pytest.fixture(name="router_mock")
-def router_mock_fixture(monkeypatch: pytest.MonkeyPatch):
+def router_mock_fixture(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
     """Mock the router function."""
     mock = MagicMock(spec=app_module.router)
     monkeypatch.setattr("webhook_router.app.router", mock)
     return mock
 
 
-@pytest.fixture(name="app")
-def app_fixture(
-    flavours_yaml: str, route_table: RoutingTable, monkeypatch: pytest.MonkeyPatch
-) -> Iterator[Flask]:
-    """Setup the flask app.
+@pytest.fixture(name="bare_app", scope="module")
+def bare_app_fixture() -> Flask:
+    """Create a bare flask app once for the config tests."""
+    return Flask(__name__)
 
-    Setup testing mode and add a stream handler to the logger.
-    """
-    mock = MagicMock(spec=webhook_router.router.to_routing_table, return_value=route_table)
-    monkeypatch.setattr("webhook_router.app.to_routing_table", mock)
-    app_module.app.config.update(
-        {
-            "TESTING": True,
-            "FLAVOURS": flavours_yaml,
-            "DEFAULT_SELF_HOSTED_LABELS": "self-hosted,linux",
-            "DEFAULT_FLAVOUR": "small",
-        }
-    )
-    app_module.config_app(app_module.app)
-    yield app_module.app
+
+@pytest.fixture(name="unconfigured_app")
+def unconfigured_app_fixture(bare_app: Flask) -> Flask:
+    """Reset the config of the bare flask app to the flask defaults."""
+    bare_app.config.clear()
+    bare_app.config.update(Flask.default_config)
+    return bare_app
 
 
 @pytest.fixture(name="webhook_to_job_mock")
@@ -108,62 +101,56 @@ def test_webhook_logs(
     act: Post a request to the webhook endpoint with a valid payload for the supported event.
     assert: 200 status code is returned and the expected job is forwarded.
     """
-    data = _create_valid_data(JobStatus.QUEUED)
-    expected_job = Job(
-        labels=set(TEST_LABELS) - DEFAULT_SELF_HOSTED_LABELS,
-        status=JobStatus.QUEUED,
-        url=data["workflow_job"]["url"],
-    )
     response = client.post(
         TEST_PATH,
-        json=data,
-        headers={app_module.GITHUB_EVENT_HEADER: app_module.SUPPORTED_GITHUB_EVENT},
+        data=_create_valid_payload(JobStatus.QUEUED),
+        content_type="application/json",
+        environ_base=GITHUB_EVENT_ENVIRON,
     )
     assert response.status_code == 200
-    router_mock.forward.assert_called_with(expected_job, routing_table=route_table)
+    router_mock.forward.assert_called_with(EXPECTED_JOB, routing_table=route_table)
 
 
-def test_non_json_request(client: FlaskClient):
+@pytest.mark.parametrize(
+    "content_type, expected_status",
+    [
+        pytest.param(None, UNSUPPORTED_MEDIA_TYPE, id="non-json content type"),
+        pytest.param("application/json", BAD_REQUEST, id="json content type"),
+    ],
+)
+def test_non_json_request(client: FlaskClient, content_type: str | None, expected_status: int):
     """
-    arrange: A test client and a webhook log file.
-    act: Post a request to the webhook endpoint with
-        1. non-json content.
-        2. non-json content but with application/json content type.
-    assert:
-        1. UnsupportedMediaType status code is returned.
-        2. BadRequest status code is returned.
+    arrange: A test client.
+    act: Post a request to the webhook endpoint with non-json content and the content type.
+    assert: The expected status code is returned.
     """
     response = client.post(
         TEST_PATH,
         data="bad data",
-        headers={app_module.GITHUB_EVENT_HEADER: app_module.SUPPORTED_GITHUB_EVENT},
-    )
-    assert response.status_code == UnsupportedMediaType.code
-
-    response = client.post(
-        TEST_PATH,
-        data="bad data",
-        content_type="application/json",
-        headers={app_module.GITHUB_EVENT_HEADER: app_module.SUPPORTED_GITHUB_EVENT},
+        content_type=content_type,
+        environ_base=GITHUB_EVENT_ENVIRON,
     )
-    assert response.status_code == BadRequest.code
+    assert response.status_code == expected_status
 
 
-def test_wrong_github_event(client: FlaskClient):
+@pytest.mark.parametrize(
+    "headers",
+    [
+        pytest.param({}, id="missing event header"),
+        pytest.param({app_module.GITHUB_EVENT_HEADER: "push"}, id="unsupported event header"),
+    ],
+)
+def test_wrong_github_event(client: FlaskClient, headers: dict[str, str]):
     """
     arrange: A test client.
-    act: Post a request to the webhook endpoint:
-        1. with a missing GITHUB_EVENT_HEADER.
-        2. with an unsupported GITHUB_EVENT_HEADER.
-    assert: BadRequest status code is returned in both cases.
+    act: Post a request to the webhook endpoint with a missing or unsupported
+        GITHUB_EVENT_HEADER.
+    assert: BadRequest status code is returned.
     """
-    response = client.post(TEST_PATH, json={"test": "data"})
-    assert response.status_code == BadRequest.code
-
     response = client.post(
-        TEST_PATH, json={"test": "data"}, headers={app_module.GITHUB_EVENT_HEADER: "push"}
+        TEST_PATH, data=OTHER_PAYLOAD, content_type="application/json", headers=headers
     )
-    assert response.status_code == BadRequest.code
+    assert response.status_code == BAD_REQUEST
 
 
 def test_invalid_payload(client: FlaskClient, webhook_to_job_mock: MagicMock):
@@ -172,14 +159,14 @@ def test_invalid_payload(client: FlaskClient, webhook_to_job_mock: MagicMock):
     act: Post a request to the webhook endpoint with an invalid payload.
     assert: BadRequest status code is returned.
     """
-    data = _create_valid_data(JobStatus.QUEUED)
     webhook_to_job_mock.side_effect = ParseError("Invalid payload")
     response = client.post(
         TEST_PATH,
-        json=data,
-        headers={app_module.GITHUB_EVENT_HEADER: app_module.SUPPORTED_GITHUB_EVENT},
+        data=_create_valid_payload(JobStatus.QUEUED),
+        content_type="application/json",
+        environ_base=GITHUB_EVENT_ENVIRON,
     )
-    assert response.status_code == BadRequest.code
+    assert response.status_code == BAD_REQUEST
 
 
 def test_router_error(client: FlaskClient, router_mock: MagicMock):
@@ -189,62 +176,69 @@ def test_router_error(client: FlaskClient, router_mock: MagicMock):
     assert: 200 status code is returned and the logs contain the expected job and flavors.
     """
     router_mock.forward.side_effect = RouterError("Invalid label combination")
-    data = _create_valid_data(JobStatus.QUEUED)
     response = client.post(
         TEST_PATH,
-        json=data,
-        headers={app_module.GITHUB_EVENT_HEADER: app_module.SUPPORTED_GITHUB_EVENT},
+        data=_create_valid_payload(JobStatus.QUEUED),
+        content_type="application/json",
+        environ_base=GITHUB_EVENT_ENVIRON,
     )
     assert response.status_code == 400
-    assert "Invalid label combination" in response.data.decode("utf-8")
+    assert b"Invalid label combination" in response.data
 
 
-@pytest.mark.usefixtures("router_mock")
 @pytest.mark.parametrize(
-    "create_signature_fct, expected_status, expected_reason",
+    "headers, expected_status, expected_reason",
     [
         pytest.param(
-            create_correct_signature,
+            {
+                **VALIDATION_HEADERS,
+                app_module.WEBHOOK_SIGNATURE_HEADER: create_correct_signature(
+                    WEBHOOK_SECRET, VALID_PAYLOAD
+                ),
+            },
             200,
-            "",
+            b"",
             id="correct signature",
         ),
         pytest.param(
-            create_incorrect_signature,
+            {
+                **VALIDATION_HEADERS,
+                app_module.WEBHOOK_SIGNATURE_HEADER: create_incorrect_signature(
+                    WEBHOOK_SECRET, VALID_PAYLOAD
+                ),
+            },
             403,
-            "Signature validation failed!",
+            b"Signature validation failed!",
             id="incorrect signature",
         ),
-        pytest.param(None, 403, "X-Hub-signature-256 header is missing!", id="missing signature"),
+        pytest.param(
+            VALIDATION_HEADERS,
+            403,
+            b"X-Hub-signature-256 header is missing!",
+            id="missing signature",
+        ),
     ],
 )
 def test_webhook_validation(
     client: FlaskClient,
-    create_signature_fct: Callable[[str, bytes], str],
+    headers: dict[str, str],
     expected_status: int,
-    expected_reason: str,
-    app: Flask,
+    expected_reason: bytes,
+    monkeypatch: pytest.MonkeyPatch,
 ):
     """
     arrange: A test client and webhook secrets enabled.
     act: Post a request to the webhook endpoint.
     assert: Expected status code and reason.
     """
-    secret = secrets.token_hex(16)
-    payload_value = _create_valid_data("queued")
-    payload = json.dumps(payload_value).encode("utf-8")
-    app.config["WEBHOOK_SECRET"] = secret
-    headers = {
-        "Content-Type": "application/json",
-        app_module.GITHUB_EVENT_HEADER: app_module.SUPPORTED_GITHUB_EVENT,
-    }
-    if create_signature_fct is not None:
-        headers[app_module.WEBHOOK_SIGNATURE_HEADER] = create_signature_fct(secret, payload)
-
-    response = client.post(TEST_PATH, data=payload, headers=headers)
+    monkeypatch.setitem(client.application.config, "WEBHOOK_SECRET", WEBHOOK_SECRET)
+    # the forwarded job is not inspected, so forwarding only has to be bypassed
+    monkeypatch.setattr(app_module.router, "forward", lambda job, routing_table: None)
+
+    response = client.post(TEST_PATH, data=VALID_PAYLOAD, headers=headers)
 
     assert response.status_code == expected_status
-    assert response.text == expected_reason
+    assert response.data == expected_reason
 
 
 def test_health_check(client: FlaskClient, monkeypatch: pytest.MonkeyPatch):
@@ -253,12 +247,12 @@ def test_health_check(client: FlaskClient, monkeypatch: pytest.MonkeyPatch):
     act: Request the health check endpoint.
     assert: 200 status code is returned in the first case and 503 in the second.
     """
-    monkeypatch.setattr(app_module.router, "can_forward", MagicMock(return_value=True))
+    monkeypatch.setattr(app_module.router, "can_forward", lambda: True)
     response = client.get("/health")
     assert response.status_code == 200
     assert response.data == b""
 
-    monkeypatch.setattr(app_module.router, "can_forward", MagicMock(return_value=False))
+    monkeypatch.setattr(app_module.router, "can_forward", lambda: False)
     response = client.get("/health")
     assert response.status_code == 503
     assert response.data == b"Router is not ready to forward jobs."
@@ -331,69 +325,80 @@ small:
         ),
     ],
 )
-def test_invalid_app_config_flavours(flavours_yaml: str, expected_err_msg: str):
+def test_invalid_app_config_flavours(
+    unconfigured_app: Flask, flavours_yaml: str, expected_err_msg: str
+):
     """
     arrange: An invalid flavours yaml.
     act: Configure the app.
     assert: A ConfigError is raised with the expected error message.
     """
-    app = Flask(__name__)
-    app.config["FLAVOURS"] = flavours_yaml
-    app.config["DEFAULT_SELF_HOSTED_LABELS"] = "self-hosted,linux"
-    app.config["DEFAULT_FLAVOUR"] = "small"
+    unconfigured_app.config["FLAVOURS"] = flavours_yaml
+    unconfigured_app.config["DEFAULT_SELF_HOSTED_LABELS"] = "self-hosted,linux"
+    unconfigured_app.config["DEFAULT_FLAVOUR"] = "small"
 
     with pytest.raises(app_module.ConfigError) as exc_info:
-        app_module.config_app(app)
+        app_module.config_app(unconfigured_app)
     assert str(exc_info.value) == expected_err_msg
 
 
-def test_invalid_app_config_default_self_hosted_labels_missing(flavours_yaml: str):
+def test_invalid_app_config_default_self_hosted_labels_missing(
+    unconfigured_app: Flask, flavours_yaml: str
+):
     """
     arrange: A valid flavours yaml and missing DEFAULT_SELF_HOSTED_LABELS.
     act: Configure the app.
     assert: A ConfigError is raised with the expected error message.
     """
-    app = Flask(__name__)
-    app.config["FLAVOURS"] = flavours_yaml
-    app.config["DEFAULT_FLAVOUR"] = "small"
+    unconfigured_app.config["FLAVOURS"] = flavours_yaml
+    unconfigured_app.config["DEFAULT_FLAVOUR"] = "small"
 
     with pytest.raises(app_module.ConfigError) as exc_info:
-        app_module.config_app(app)
+        app_module.config_app(unconfigured_app)
     assert str(exc_info.value) == "DEFAULT_SELF_HOSTED_LABELS config is not set!"
 
 
-def test_invalid_app_config_default_flavour_missing(flavours_yaml: str):
+def test_invalid_app_config_default_flavour_missing(unconfigured_app: Flask, flavours_yaml: str):
     """
     arrange: A valid flavours yaml and missing DEFAULT_FLAVOUR.
     act: Configure the app.
     assert: A ConfigError is raised with the expected error message.
     """
-    app = Flask(__name__)
-    app.config["FLAVOURS"] = flavours_yaml
-    app.config["DEFAULT_SELF_HOSTED_LABELS"] = "self-hosted,linux"
+    unconfigured_app.config["FLAVOURS"] = flavours_yaml
+    unconfigured_app.config["DEFAULT_SELF_HOSTED_LABELS"] = "self-hosted,linux"
 
     with pytest.raises(app_module.ConfigError) as exc_info:
-        app_module.config_app(app)
+        app_module.config_app(unconfigured_app)
     assert str(exc_info.value) == "DEFAULT_FLAVOUR config is not set!"
 
 
-def _create_valid_data(action: str) -> dict:
-    """Create a valid payload for the supported event.
+def test_app_config_default_self_hosted_labels_lowercase(
+    unconfigured_app: Flask, flavours_yaml: str
+):
+    """
+    arrange: A valid flavours yaml and DEFAULT_SELF_HOSTED_LABELS in mixed case.
+    act: Configure the app.
+    assert: The default self-hosted labels are stored in lowercase.
+    """
+    unconfigured_app.config["FLAVOURS"] = flavours_yaml
+    unconfigured_app.config["DEFAULT_SELF_HOSTED_LABELS"] = "Self-Hosted,LINUX"
+    unconfigured_app.config["DEFAULT_FLAVOUR"] = "small"
+
+    app_module.config_app(unconfigured_app)
+
+    assert unconfigured_app.config["DEFAULT_SELF_HOSTED_LABELS"] == {"self-hosted", "linux"}
+
+
+@functools.lru_cache(maxsize=None)
+def _create_valid_payload(action: str) -> bytes:
+    """Create a valid serialized payload for the supported event.
+
+    The payload is cached per action, as the tests post identical payloads.
 
     Args:
         action: The action to include in the payload.
 
     Returns:
-        A valid payload for the supported event.
+        A valid JSON encoded payload for the supported event.
     """
-    return {
-        "action": action,
-        "workflow_job": {
-            "id": 123456789,
-            "run_id": 987654321,
-            "status": "completed",
-            "conclusion": "success",
-            "labels": TEST_LABELS,
-            "url": "https://api.github.com/repos/f/actions/jobs/8200803099",
-        },
-    }
+    return json.dumps({"action": action, "workflow_job": VALID_WORKFLOW_JOB}).encode("utf-8")
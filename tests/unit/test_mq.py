@@ -2,7 +2,6 @@
 #  See LICENSE file for licensing details.
 
 """The unit tests for the mq module."""
-import secrets
 from unittest.mock import MagicMock
 
 import pytest
@@ -13,6 +12,8 @@ from webhook_router import mq
 from webhook_router.parse import Job, JobStatus
 
 IN_MEMORY_URI = "memory://"
+FLAVOR = "test-flavor"
+LABELS = ["test-label-1", "test-label-2"]
 
 
 @pytest.fixture(name="in_memory_mq")
@@ -28,14 +29,12 @@ def test_add_job_to_queue():
     act: add the job to the queue
     assert: the job is added to the queue
     """
-    flavor = secrets.token_hex(16)
-    labels = [secrets.token_hex(16), secrets.token_hex(16)]
     # mypy: does not recognize that url can be passed as a string
-    job = Job(labels=labels, status=JobStatus.QUEUED, url="http://example.com")  # type: ignore
-    mq.add_job_to_queue(job, flavor)
+    job = Job(labels=LABELS, status=JobStatus.QUEUED, url="http://example.com")  # type: ignore
+    mq.add_job_to_queue(job, FLAVOR)
 
     with Connection(IN_MEMORY_URI) as conn:
-        simple_queue = conn.SimpleQueue(flavor)
+        simple_queue = conn.SimpleQueue(FLAVOR)
 
         msg = simple_queue.get(block=True, timeout=1)
         assert msg.payload == job.json()
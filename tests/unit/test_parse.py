@@ -11,19 +11,63 @@ from webhook_router.parse import Job, JobStatus, Labels, ParseError, webhook_to_
 FAKE_JOB_URL = "https://api.github.com/repos/fakeusergh-runner-test/actions/jobs/8200803099"
 FAKE_LABELS = ["self-hosted", "linux", "arm64"]
 DEFAULT_SELF_HOSTED_LABELS = {"self-hosted", "linux"}
-
-
+# The workflow job of a real webhook payload, the tests must not modify it.
+WORKFLOW_JOB = {
+    "id": 22428484402,
+    "run_id": 8200803099,
+    "workflow_name": "Push Event Tests",
+    "head_branch": "github-hosted",
+    "run_url": "https://api.github.com/repos/canonical/f/actions/runs/8200803099",
+    "run_attempt": 5,
+    "node_id": "CR_kwDOKQMbDc8AAAAFONeDMg",
+    "head_sha": "fc670c970f0c5e156a94d1935776d7ed43728067",
+    "url": FAKE_JOB_URL,
+    "html_url": "https://github.com/f/actions/runs/8200803099/job/22428484402",
+    "status": "queued",
+    "conclusion": None,
+    "created_at": "2024-03-08T08:46:26Z",
+    "started_at": "2024-03-08T08:46:26Z",
+    "completed_at": None,
+    "name": "push-event-tests",
+    "steps": [],
+    "check_url": "https://api.github.com/repos/f/check-runs/22428484402",
+    "runner_id": None,
+    "runner_name": None,
+    "runner_group_id": None,
+    "runner_group_name": None,
+}
+
+
+# mypy does not understand that we can pass strings instead of HttpUrl objects
+# because of the underlying pydantic magic, so the url arguments are ignored.
 @pytest.mark.parametrize(
-    "labels, status",
+    "labels, status, expected_job",
     [
-        pytest.param(["self-hosted", "linux", "arm64"], JobStatus.QUEUED, id="self hosted queued"),
-        pytest.param(["ubuntu-latest"], JobStatus.IN_PROGRESS, id="ubuntu latest in progress"),
         pytest.param(
-            ["self-hosted", "linux", "amd"], JobStatus.COMPLETED, id="self hosted completed"
+            ["self-hosted", "linux", "arm64"],
+            JobStatus.QUEUED,
+            Job(labels={"arm64"}, status=JobStatus.QUEUED, url=FAKE_JOB_URL),  # type: ignore
+            id="self hosted queued",
+        ),
+        pytest.param(
+            ["ubuntu-latest"],
+            JobStatus.IN_PROGRESS,
+            Job(
+                labels={"ubuntu-latest"},
+                status=JobStatus.IN_PROGRESS,
+                url=FAKE_JOB_URL,  # type: ignore
+            ),
+            id="ubuntu latest in progress",
+        ),
+        pytest.param(
+            ["self-hosted", "linux", "amd"],
+            JobStatus.COMPLETED,
+            Job(labels={"amd"}, status=JobStatus.COMPLETED, url=FAKE_JOB_URL),  # type: ignore
+            id="self hosted completed",
         ),
     ],
 )
-def test_webhook_to_job(labels: list[str], status: JobStatus):
+def test_webhook_to_job(labels: list[str], status: JobStatus, expected_job: Job):
     """
     arrange: A valid payload dict.
     act: Call webhook_to_job with the payload.
@@ -31,42 +75,12 @@ def test_webhook_to_job(labels: list[str], status: JobStatus):
     """
     payload = {
         "action": status,
-        "workflow_job": {
-            "id": 22428484402,
-            "run_id": 8200803099,
-            "workflow_name": "Push Event Tests",
-            "head_branch": "github-hosted",
-            "run_url": "https://api.github.com/repos/canonical/f/actions/runs/8200803099",
-            "run_attempt": 5,
-            "node_id": "CR_kwDOKQMbDc8AAAAFONeDMg",
-            "head_sha": "fc670c970f0c5e156a94d1935776d7ed43728067",
-            "url": FAKE_JOB_URL,
-            "html_url": "https://github.com/f/actions/runs/8200803099/job/22428484402",
-            "status": "queued",
-            "conclusion": None,
-            "created_at": "2024-03-08T08:46:26Z",
-            "started_at": "2024-03-08T08:46:26Z",
-            "completed_at": None,
-            "name": "push-event-tests",
-            "steps": [],
-            "check_url": "https://api.github.com/repos/f/check-runs/22428484402",
-            "labels": labels,
-            "runner_id": None,
-            "runner_name": None,
-            "runner_group_id": None,
-            "runner_group_name": None,
-        },
+        "workflow_job": {**WORKFLOW_JOB, "labels": labels},
     }
 
     result = webhook_to_job(payload, DEFAULT_SELF_HOSTED_LABELS)
 
-    # mypy does not understand that we can pass strings instead of HttpUrl objects
-    # because of the underlying pydantic magic
-    assert result == Job(
-        labels=set(labels) - DEFAULT_SELF_HOSTED_LABELS,
-        status=status,
-        url=FAKE_JOB_URL,  # type: ignore
-    )
+    assert result == expected_job
 
 
 @pytest.mark.parametrize(
@@ -113,51 +127,59 @@ def test_webhook_workflow_job_not_dict():
     assert f"workflow_job is not a dict in {payload}" in str(exc_info.value)
 
 
-def test_webhook_missing_keys():
+@pytest.mark.parametrize(
+    "payload, missing_key",
+    [
+        pytest.param(
+            {
+                "payload": {
+                    "workflow_job": {
+                        "id": 22428484402,
+                        "url": FAKE_JOB_URL,
+                        "labels": FAKE_LABELS,
+                    },
+                },
+            },
+            "action",
+            id="action",
+        ),
+        pytest.param(
+            {
+                "action": "queued",
+                "id": 22428484402,
+                "url": FAKE_JOB_URL,
+                "labels": FAKE_LABELS,
+            },
+            "workflow_job",
+            id="workflow_job",
+        ),
+        pytest.param(
+            {
+                "action": "queued",
+                "workflow_job": {"id": 22428484402, "url": FAKE_JOB_URL},
+            },
+            "labels",
+            id="labels",
+        ),
+        pytest.param(
+            {
+                "action": "queued",
+                "workflow_job": {"id": 22428484402, "labels": FAKE_LABELS},
+            },
+            "url",
+            id="url",
+        ),
+    ],
+)
+def test_webhook_missing_keys(payload: dict, missing_key: str):
     """
-    arrange: A payload dict with missing keys.
+    arrange: A payload dict with a missing key.
     act: Call webhook_to_job with the payload.
     assert: A ParseError is raised.
     """
-    payload: dict
-
-    # action key is missing
-    payload = {
-        "payload": {
-            "workflow_job": {"id": 22428484402, "url": FAKE_JOB_URL, "labels": FAKE_LABELS},
-        },
-    }
-    with pytest.raises(ParseError) as exc_info:
-        webhook_to_job(payload, DEFAULT_SELF_HOSTED_LABELS)
-    assert f"action key not found in {payload}" in str(exc_info.value)
-    # workflow_job key missing
-    payload = {
-        "action": "queued",
-        "id": 22428484402,
-        "url": FAKE_JOB_URL,
-        "labels": FAKE_LABELS,
-    }
-    with pytest.raises(ParseError) as exc_info:
-        webhook_to_job(payload, DEFAULT_SELF_HOSTED_LABELS)
-    assert f"workflow_job key not found in {payload}" in str(exc_info.value)
-
-    # labels key missing
-    payload = {
-        "action": "queued",
-        "workflow_job": {"id": 22428484402, "url": FAKE_JOB_URL},
-    }
-    with pytest.raises(ParseError) as exc_info:
-        webhook_to_job(payload, DEFAULT_SELF_HOSTED_LABELS)
-    assert f"labels key not found in {payload}" in str(exc_info.value)
-
-    # url key missing
-    payload = {
-        "action": "queued",
-        "workflow_job": {"id": 22428484402, "labels": FAKE_LABELS},
-    }
     with pytest.raises(ParseError) as exc_info:
         webhook_to_job(payload, DEFAULT_SELF_HOSTED_LABELS)
-    assert f"url key not found in {payload}" in str(exc_info.value)
+    assert f"{missing_key} key not found in {payload}" in str(exc_info.value)
 
 
 @pytest.mark.parametrize(
@@ -198,10 +220,10 @@ def test_labels_are_parsed_in_lowercase():
     """
     arrange: A valid payload dict with labels in mixed_case.
     act: Call webhook_to_job with the payload.
-    assert: The labels are parsed and compared with the ignore labels in lowercase.
+    assert: The labels are parsed in lowercase and the ignore labels are removed.
     """
     labels = ["Self-Hosted", "Linux", "ARM64"]
-    ignore_labels = {"self-Hosted", "linUX"}
+    ignore_labels = {"self-hosted", "linux"}
     payload = {
         "action": JobStatus.QUEUED,
         "workflow_job": {"id": 22428484402, "url": FAKE_JOB_URL, "labels": labels},
@@ -3,11 +3,9 @@
 
 """Unit tests for the router module."""
 import itertools
-from unittest.mock import MagicMock
 
 import pytest
 
-from webhook_router.mq import add_job_to_queue
 from webhook_router.parse import Job, JobStatus
 from webhook_router.router import (
     RouterError,
@@ -19,13 +17,46 @@ from webhook_router.router import (
     to_routing_table,
 )
 
+ARM_FLAVOR_LABELS = ["arm64", "jammy", "large"]
+X64_FLAVOR_LABELS = ["large", "noble", "x64"]
+# the combinations are unique, so they do not have to be deduplicated in a set
+ARM_LABEL_COMBINATIONS = [
+    x
+    for length in range(1, len(ARM_FLAVOR_LABELS) + 1)
+    for x in itertools.combinations(ARM_FLAVOR_LABELS, length)
+]
+# the "large" label alone is routed to the first flavor
+X64_LABEL_COMBINATIONS = [
+    x
+    for length in range(1, len(X64_FLAVOR_LABELS) + 1)
+    for x in itertools.combinations(X64_FLAVOR_LABELS, length)
+    if x != ("large",)
+]
+# mypy does not understand that we can pass strings instead of HttpUrl objects
+# because of the underlying pydantic magic
+QUEUED_ARM64_JOB = Job(
+    labels={"arm64"},
+    status=JobStatus.QUEUED,
+    url="https://api.github.com/repos/f/actions/jobs/8200803099",  # type: ignore
+)
+LABEL_COMBINATIONS_ROUTING_TABLE = RoutingTable(
+    value={
+        **{label_combination: "large" for label_combination in ARM_LABEL_COMBINATIONS},
+        **{label_combination: "x64-large" for label_combination in X64_LABEL_COMBINATIONS},
+    },
+    default_flavor="large",
+)
 
-@pytest.fixture(name="add_job_to_queue_mock")
-def add_job_to_queue_mock_fixture(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
-    """Mock the add_job_to_queue function."""
-    mock = MagicMock(spec=add_job_to_queue)
-    monkeypatch.setattr("webhook_router.router.mq.add_job_to_queue", mock)
-    return mock
+
+@pytest.fixture(name="queued_jobs")
+def queued_jobs_fixture(monkeypatch: pytest.MonkeyPatch) -> list[tuple[Job, str]]:
+    """Record the jobs and flavors passed to the add_job_to_queue function."""
+    queued_jobs: list[tuple[Job, str]] = []
+    monkeypatch.setattr(
+        "webhook_router.router.mq.add_job_to_queue",
+        lambda job, flavor: queued_jobs.append((job, flavor)),
+    )
+    return queued_jobs
 
 
 @pytest.mark.parametrize(
@@ -40,26 +71,47 @@ def add_job_to_queue_mock_fixture(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
 def test_job_is_forwarded(
     job_status: JobStatus,
     is_forwarded: bool,
-    add_job_to_queue_mock: MagicMock,
+    queued_jobs: list[tuple[Job, str]],
 ):
     """
     arrange: A job with a status.
     act: Forward the job to the message queue.
     assert: The job is added to the queue if the status is "QUEUED".
     """
+    job = QUEUED_ARM64_JOB.model_copy(update={"status": job_status})
+    forward(
+        job,
+        routing_table=RoutingTable(value={("arm64",): "arm64"}, default_flavor="arm64"),
+    )
+
+    assert queued_jobs == ([(job, "arm64")] if is_forwarded else [])
+
+
+@pytest.mark.parametrize(
+    "job_status",
+    [
+        pytest.param(JobStatus.COMPLETED, id="completed"),
+        pytest.param(JobStatus.IN_PROGRESS, id="in_progress"),
+        pytest.param(JobStatus.WAITING, id="waiting"),
+    ],
+)
+def test_job_is_not_routed(job_status: JobStatus, queued_jobs: list[tuple[Job, str]]):
+    """
+    arrange: A job with a status other than "QUEUED" and an invalid label combination.
+    act: Forward the job to the message queue.
+    assert: The job is ignored without looking up its labels in the routing table.
+    """
     # mypy does not understand that we can pass strings instead of HttpUrl objects
     # because of the underlying pydantic magic
     job = Job(
-        labels={"arm64"},
+        labels={"self-hosted", "linux", "arm64", "x64"},
         status=job_status,
         url="https://api.github.com/repos/f/actions/jobs/8200803099",  # type: ignore
     )
-    forward(
-        job,
-        routing_table=RoutingTable(value={("arm64",): "arm64"}, default_flavor="arm64"),
-    )
 
-    assert add_job_to_queue_mock.called == is_forwarded
+    forward(job, routing_table=RoutingTable(value={}, default_flavor="default"))
+
+    assert not queued_jobs
 
 
 def test_invalid_label_combination():
@@ -134,132 +186,58 @@ def test_can_forward(monkeypatch: pytest.MonkeyPatch):
     act: Call can_forward.
     assert: True is returned if the connection is successful otherwise False.
     """
-    monkeypatch.setattr("webhook_router.router.mq.can_connect", MagicMock(return_value=True))
+    monkeypatch.setattr("webhook_router.router.mq.can_connect", lambda: True)
     assert can_forward() is True
 
-    monkeypatch.setattr("webhook_router.router.mq.can_connect", MagicMock(return_value=False))
+    monkeypatch.setattr("webhook_router.router.mq.can_connect", lambda: False)
     assert can_forward() is False
 
 
-def test__labels_to_flavor():
-    """
-    arrange: Two flavors and a routing_table
-    act: Call labels_to_flavor with all combination of labels.
-    assert: The correct flavor is returned.
-    """
-    arm_flavor_labels = ["arm64", "jammy", "large"]
-    x64_flavor_labels = ["large", "noble", "x64"]
-    arm_label_combination = set(
-        x
-        for length in range(1, len(arm_flavor_labels) + 1)
-        for x in itertools.combinations(arm_flavor_labels, length)
-    )
-    x64_label_combination = set(
-        x
-        for length in range(1, len(x64_flavor_labels) + 1)
-        for x in itertools.combinations(x64_flavor_labels, length)
-    )
-    x64_label_combination.remove(("large",))
-    routing_table = RoutingTable(
-        value={
-            **{label_combination: "large" for label_combination in arm_label_combination},
-            **{label_combination: "x64-large" for label_combination in x64_label_combination},
-        },
-        default_flavor="large",
-    )
-
-    for label_combination in arm_label_combination:
-        assert (
-            _labels_to_flavor(set(label_combination), routing_table) == "large"
-        ), f"Expected large flavor for {label_combination}"
-
-    for label_combination in x64_label_combination:
-        assert (
-            _labels_to_flavor(set(label_combination), routing_table) == "x64-large"
-        ), f"Expected x64-large flavor for {label_combination}"
-
-
-def test__labels_to_flavor_case_insensitive():
+@pytest.mark.parametrize(
+    "label_combination, expected_flavor",
+    [
+        *((label_combination, "large") for label_combination in ARM_LABEL_COMBINATIONS),
+        *((label_combination, "x64-large") for label_combination in X64_LABEL_COMBINATIONS),
+    ],
+)
+def test__labels_to_flavor(label_combination: tuple[str, ...], expected_flavor: str):
     """
     arrange: Two flavors and a routing_table
-    act: Call labels_to_flavor with all combination of labels in mixed case.
+    act: Call labels_to_flavor with a combination of labels.
     assert: The correct flavor is returned.
     """
-    routing_table = RoutingTable(
-        value={
-            ("small",): "small",
-            ("arm64",): "large",
-            ("large",): "large",
-            ("arm64", "large"): "large",
-        },
-        default_flavor="large",
+    assert (
+        _labels_to_flavor(set(label_combination), LABEL_COMBINATIONS_ROUTING_TABLE)
+        == expected_flavor
     )
 
-    assert _labels_to_flavor({"SMALl"}, routing_table) == "small"
-    assert _labels_to_flavor({"ARM64"}, routing_table) == "large"
-    assert _labels_to_flavor({"lARGE"}, routing_table) == "large"
-    assert _labels_to_flavor({"arM64", "lArge"}, routing_table) == "large"
-    assert _labels_to_flavor({"small"}, routing_table) == "small"
-
 
-def test__labels_to_flavor_default_flavor():
+def test__labels_to_flavor_default_flavor(route_table: RoutingTable):
     """
     arrange: Two flavors and a labels to flavor routing_table
     act: Call labels_to_flavor with empty labels.
     assert: The default flavor is returned.
     """
-    routing_table = RoutingTable(
-        value={
-            ("arm64",): "large",
-            ("large",): "large",
-            ("arm64", "large"): "large",
-            ("x64",): "large-x64",
-            ("large", "x64"): "x64-large",
-        },
-        default_flavor="large",
-    )
-    assert _labels_to_flavor(set(), routing_table) == "large"
+    assert _labels_to_flavor(set(), route_table) == "small"
 
 
-def test__labels_to_flavor_invalid_combination():
+def test__labels_to_flavor_invalid_combination(route_table: RoutingTable):
     """
     arrange: Two flavors and a labels to flavor routing_table
     act: Call labels_to_flavor with an invalid combination.
     assert: An InvalidLabelCombinationError is raised.
     """
-    routing_table = RoutingTable(
-        value={
-            ("arm64",): "large",
-            ("large",): "large",
-            ("arm64", "large"): "large",
-            ("x64",): "large-x64",
-            ("large", "x64"): "x64-large",
-        },
-        default_flavor="large",
-    )
     labels = {"self-hosted", "linux", "arm64", "large", "x64"}
-    with pytest.raises(_InvalidLabelCombinationError) as exc_info:
-        _labels_to_flavor(labels, routing_table)
-    assert "Invalid label combination:" in str(exc_info.value)
+    with pytest.raises(_InvalidLabelCombinationError, match="Invalid label combination:"):
+        _labels_to_flavor(labels, route_table)
 
 
-def test__labels_to_flavor_unrecognised_label():
+def test__labels_to_flavor_unrecognised_label(route_table: RoutingTable):
     """
     arrange: Two flavors and a labels to flavor routing_table
     act: Call labels_to_flavor with an unrecognised label.
     assert: An InvalidLabelCombinationError is raised.
     """
-    routing_table = RoutingTable(
-        value={
-            ("arm64",): "large",
-            ("large",): "large",
-            ("arm64", "large"): "large",
-            ("x64",): "large-x64",
-            ("large", "x64"): "x64-large",
-        },
-        default_flavor="large",
-    )
     labels = {"self-hosted", "linux", "arm64", "large", "noble"}
-    with pytest.raises(_InvalidLabelCombinationError) as exc_info:
-        _labels_to_flavor(labels, routing_table)
-    assert "Invalid label combination:" in str(exc_info.value)
+    with pytest.raises(_InvalidLabelCombinationError, match="Invalid label combination:"):
+        _labels_to_flavor(labels, route_table)
@@ -2,40 +2,34 @@
 #  See LICENSE file for licensing details.
 
 """The unit tests for the validation module."""
-import secrets
-from typing import Callable
-
 import pytest
 
 from tests.unit.helpers import create_correct_signature, create_incorrect_signature
 from webhook_router.validation import verify_signature
 
+TEST_SECRET = "test-webhook-secret"  # nosec this is no hardcoded password
+TEST_PAYLOAD = b'{"action": "queued", "workflow_job": {"id": 123456789}}'
+
 
 @pytest.mark.parametrize(
-    "create_signature_fct, expected_return_value",
+    "signature, expected_return_value",
     [
         pytest.param(
-            create_correct_signature,
+            create_correct_signature(TEST_SECRET, TEST_PAYLOAD),
             True,
             id="correct signature",
         ),
         pytest.param(
-            create_incorrect_signature,
+            create_incorrect_signature(TEST_SECRET, TEST_PAYLOAD),
             False,
             id="incorrect signature",
         ),
     ],
 )
-def test_verify_signature(
-    create_signature_fct: Callable[[str, bytes], str], expected_return_value: bool
-):
+def test_verify_signature(signature: str, expected_return_value: bool):
     """
     arrange: A payload, a secret, and a signature.
     act: Verify the signature.
     assert: The expected return value is returned.
     """
-    secret = secrets.token_hex(16)
-    payload = secrets.token_bytes(16)
-    expected_sig = create_signature_fct(secret, payload)
-
-    assert verify_signature(payload, secret, expected_sig) is expected_return_value
+    assert verify_signature(TEST_PAYLOAD, TEST_SECRET, signature) is expected_return_value
@@ -2,14 +2,13 @@
 #  See LICENSE file for licensing details.
 
 """Unit tests for webhook redelivery script."""
-import secrets
+import re
 from collections import namedtuple
 from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock
 
 import github
 import pytest
-from github.HookDelivery import HookDeliverySummary
 
 from webhook_redelivery import (
     OK_STATUS,
@@ -19,6 +18,21 @@ from webhook_redelivery import (
 )
 
 _Delivery = namedtuple("_Delivery", ["id", "status", "age"])
+# The attributes of a hook delivery summary the script reads.
+_HookDeliverySummary = namedtuple(
+    "_HookDeliverySummary",
+    ["id", "status", "action", "event", "delivered_at", "raw_data"],
+    defaults=[None],
+)
+
+# The time the tests freeze for the script and the github values are the same for all tests.
+NOW = datetime.now(tz=timezone.utc)
+GITHUB_TOKEN = "test-github-token"  # nosec this is no hardcoded password
+GITHUB_ORG = "test-org"
+GITHUB_REPO = "test-repo"
+# The delivery selection does not depend on the webhook address, so test_redeliver only uses
+# the address of a repository webhook.
+REPO_WEBHOOK_ADDRESS = WebhookAddress(github_org=GITHUB_ORG, github_repo=GITHUB_REPO, id=1234)
 
 
 @pytest.fixture(
@@ -31,8 +45,8 @@ _Delivery = namedtuple("_Delivery", ["id", "status", "age"])
 def webhook_address_fixture(request: pytest.FixtureRequest) -> WebhookAddress:
     """Return a webhook address for a repository and for an organization."""
     return WebhookAddress(
-        github_org=secrets.token_hex(16),
-        github_repo=secrets.token_hex(16) if request.param else None,
+        github_org=GITHUB_ORG,
+        github_repo=GITHUB_REPO if request.param else None,
         id=1234,
     )
 
@@ -82,7 +96,6 @@ def test_redeliver(
     deliveries: list[_Delivery],
     since_seconds: int,
     expected_redelivered: set[int],
-    webhook_address: WebhookAddress,
 ):
     """
     arrange: A mocked github client and different combinations of deliveries.
@@ -91,25 +104,22 @@ def test_redeliver(
     """
     github_client = MagicMock(spec=github.Github)
     monkeypatch.setattr("webhook_redelivery.Github", MagicMock(return_value=github_client))
-    now = datetime.now(tz=timezone.utc)
-    monkeypatch.setattr("webhook_redelivery.datetime", MagicMock(now=MagicMock(return_value=now)))
+    monkeypatch.setattr("webhook_redelivery.datetime", MagicMock(now=MagicMock(return_value=NOW)))
 
-    get_hook_deliveries_mock = _get_get_deliveries_mock(github_client, webhook_address)
+    get_hook_deliveries_mock = _get_get_deliveries_mock(github_client, REPO_WEBHOOK_ADDRESS)
     get_hook_deliveries_mock.return_value = [
-        MagicMock(
-            spec=HookDeliverySummary,
+        _HookDeliverySummary(
             id=d.id,
             status=d.status,
             action="queued",
             event="workflow_job",
-            delivered_at=now - timedelta(seconds=d.age),
+            delivered_at=NOW - timedelta(seconds=d.age),
         )
         for d in deliveries
     ]
 
-    github_token = secrets.token_hex(16)
     redelivered = _redeliver_failed_webhook_delivery_attempts(
-        github_auth=github_token, webhook_address=webhook_address, since_seconds=since_seconds
+        github_auth=GITHUB_TOKEN, webhook_address=REPO_WEBHOOK_ADDRESS, since_seconds=since_seconds
     )
 
     assert redelivered == len(expected_redelivered)
@@ -118,8 +128,41 @@ def test_redeliver(
     assert redeliver_mock.call_count == redelivered
     for _id in expected_redelivered:
         return redeliver_mock.assert_any_call(
-            "POST", _get_redeliver_mock_api_url(webhook_address, _id)
+            "POST", _get_redeliver_mock_api_url(REPO_WEBHOOK_ADDRESS, _id)
+        )
+
+
+def test_redeliver_webhook_address(
+    monkeypatch: pytest.MonkeyPatch, webhook_address: WebhookAddress
+):
+    """
+    arrange: A mocked github client and a failed delivery of a repository or organization webhook.
+    act: Call the script.
+    assert: The delivery is fetched and redelivered using the API endpoints of the webhook.
+    """
+    github_client = MagicMock(spec=github.Github)
+    monkeypatch.setattr("webhook_redelivery.Github", MagicMock(return_value=github_client))
+    monkeypatch.setattr("webhook_redelivery.datetime", MagicMock(now=MagicMock(return_value=NOW)))
+
+    get_hook_deliveries_mock = _get_get_deliveries_mock(github_client, webhook_address)
+    get_hook_deliveries_mock.return_value = [
+        _HookDeliverySummary(
+            id=1,
+            status="failed",
+            action="queued",
+            event="workflow_job",
+            delivered_at=NOW - timedelta(seconds=4),
         )
+    ]
+
+    redelivered = _redeliver_failed_webhook_delivery_attempts(
+        github_auth=GITHUB_TOKEN, webhook_address=webhook_address, since_seconds=5
+    )
+
+    assert redelivered == 1
+    github_client.requester.requestJsonAndCheck.assert_called_once_with(
+        "POST", _get_redeliver_mock_api_url(webhook_address, 1)
+    )
 
 
 @pytest.mark.parametrize(
@@ -146,25 +189,22 @@ def test_redelivery_ignores_non_queued_or_non_workflow_job(
     """
     github_client = MagicMock(spec=github.Github)
     monkeypatch.setattr("webhook_redelivery.Github", MagicMock(return_value=github_client))
-    now = datetime.now(tz=timezone.utc)
-    monkeypatch.setattr("webhook_redelivery.datetime", MagicMock(now=MagicMock(return_value=now)))
+    monkeypatch.setattr("webhook_redelivery.datetime", MagicMock(now=MagicMock(return_value=NOW)))
 
     get_hook_deliveries_mock = _get_get_deliveries_mock(github_client, webhook_address)
     get_hook_deliveries_mock.return_value = [
-        MagicMock(
-            spec=HookDeliverySummary,
+        _HookDeliverySummary(
             id=d.id,
             status=d.status,
             action=action,
             event=event,
-            delivered_at=now - timedelta(seconds=d.age),
+            delivered_at=NOW - timedelta(seconds=d.age),
         )
         for d in [_Delivery(i, action, 4) for i in range(3)]
     ]
 
-    github_token = secrets.token_hex(16)
     redelivered = _redeliver_failed_webhook_delivery_attempts(
-        github_auth=github_token, webhook_address=webhook_address, since_seconds=5
+        github_auth=GITHUB_TOKEN, webhook_address=webhook_address, since_seconds=5
     )
 
     assert redelivered == 0
@@ -207,17 +247,15 @@ def test_redelivery_github_errors(
     github_client = MagicMock(spec=github.Github)
     monkeypatch.setattr("webhook_redelivery.Github", MagicMock(return_value=github_client))
 
-    github_token = secrets.token_hex(16)
     since_seconds = 5
 
     get_hook_deliveries_mock = _get_get_deliveries_mock(github_client, webhook_address)
     get_hook_deliveries_mock.side_effect = github_exception
 
-    with pytest.raises(RedeliveryError) as exc_info:
+    with pytest.raises(RedeliveryError, match=re.escape(expected_msg)):
         _redeliver_failed_webhook_delivery_attempts(
-            github_auth=github_token, webhook_address=webhook_address, since_seconds=since_seconds
+            github_auth=GITHUB_TOKEN, webhook_address=webhook_address, since_seconds=since_seconds
         )
-    assert expected_msg in str(exc_info.value)
 
 
 def test_redelivery_api_insufficient_data(
@@ -232,16 +270,14 @@ def test_redelivery_api_insufficient_data(
     github_client = MagicMock(spec=github.Github)
     monkeypatch.setattr("webhook_redelivery.Github", MagicMock(return_value=github_client))
 
-    github_token = secrets.token_hex(16)
     since_seconds = 5
 
     get_hook_deliveries_mock = _get_get_deliveries_mock(github_client, webhook_address)
     get_hook_deliveries_mock.return_value = [
-        MagicMock(
-            spec=HookDeliverySummary,
+        _HookDeliverySummary(
             id=1,
             status="failed",
-            delivered_at=datetime.now(tz=timezone.utc),
+            delivered_at=NOW,
             action="ping",
             event=None,  # missing event
         )
@@ -249,7 +285,7 @@ def test_redelivery_api_insufficient_data(
 
     with pytest.raises(AssertionError) as exc_info:
         _redeliver_failed_webhook_delivery_attempts(
-            github_auth=github_token, webhook_address=webhook_address, since_seconds=since_seconds
+            github_auth=GITHUB_TOKEN, webhook_address=webhook_address, since_seconds=since_seconds
         )
     assert "is missing required fields: {'event'}" in str(exc_info.value)
 
@@ -114,21 +114,21 @@ def _parse_default_flavor_config(default_flavor: str) -> str:
     return flavor
 
 
-def _parse_default_self_hosted_labels_config(default_self_hosted_labels: str) -> set[str]:
+def _parse_default_self_hosted_labels_config(default_self_hosted_labels: str) -> frozenset[str]:
     """Get the default labels from the config.
 
     Args:
         default_self_hosted_labels: The default labels config.
 
     Returns:
-        The default labels.
+        The default labels in lowercase.
 
     Raises:
         ConfigError: If the DEFAULT_SELF_HOSTED_LABELS config is invalid.
     """
     if not (labels := default_self_hosted_labels):
         raise ConfigError("DEFAULT_SELF_HOSTED_LABELS config is not set!")
-    return set(labels.split(","))
+    return frozenset(map(str.lower, labels.split(",")))
 
 
 @app.route("/health", methods=["GET"])
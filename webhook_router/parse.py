@@ -6,11 +6,13 @@ from collections import namedtuple
 from enum import Enum
 from typing import Collection
 
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, HttpUrl, TypeAdapter
 
 ValidationResult = namedtuple("ValidationResult", ["is_valid", "msg"])
 Labels = set[str]
 
+_HTTP_URL_ADAPTER = TypeAdapter(HttpUrl)
+
 
 class ParseError(Exception):
     """An error occurred during the parsing of the payload."""
@@ -51,7 +53,8 @@ def webhook_to_job(payload: dict, ignore_labels: Collection[str]) -> Job:
 
     Args:
         payload: The webhook's payload in json to parse.
-        ignore_labels: The labels to ignore when parsing. For example, "self-hosted" or "linux".
+        ignore_labels: The lowercase labels to ignore when parsing. For example, "self-hosted"
+            or "linux".
 
     Returns:
         The parsed Job.
@@ -87,14 +90,18 @@ def webhook_to_job(payload: dict, ignore_labels: Collection[str]) -> Job:
     job_url = workflow_job["url"]
 
     try:
-        return Job(
-            labels=_parse_labels(labels=labels, ignore_labels=ignore_labels),
-            status=status,
-            url=job_url,
-        )
+        job_status = JobStatus(status)
+        job_url = _HTTP_URL_ADAPTER.validate_python(job_url)
     except ValueError as exc:
         raise ParseError(f"Failed to create Webhook object for webhook {payload}: {exc}") from exc
 
+    # All fields are validated at this point, so the model validation can be skipped.
+    return Job.model_construct(
+        labels=_parse_labels(labels=labels, ignore_labels=ignore_labels),
+        status=job_status,
+        url=job_url,
+    )
+
 
 def _validate_webhook(webhook: dict) -> ValidationResult:
     """Validate the webhook payload.
@@ -144,11 +151,10 @@ def _parse_labels(labels: Collection[str], ignore_labels: Collection[str]) -> La
 
     Args:
         labels: The labels to parse from the payload.
-        ignore_labels: The labels to ignore.
+        ignore_labels: The lowercase labels to ignore.
 
     Returns:
         The parsed labels in lowercase.
     """
-    return {label.lower() for label in labels} - {
-        ignore_label.lower() for ignore_label in ignore_labels
-    }
+    # the ignore labels are lowercased once when the app is configured
+    return set(map(str.lower, labels)).difference(ignore_labels)
@@ -3,6 +3,7 @@
 """Module for routing webhooks to the appropriate message queue."""
 import itertools
 import logging
+from typing import Collection
 
 from pydantic import BaseModel
 
@@ -98,13 +99,13 @@ def forward(job: Job, routing_table: RoutingTable) -> None:
     Raises:
         RouterError: If the job cannot be forwarded.
     """
-    if job.status != ROUTABLE_JOB_STATUS:
+    if job.status is not ROUTABLE_JOB_STATUS:
         logger.debug("Received job with status %s. Ignoring.", job.status)
         return
 
     try:
         flavor = _labels_to_flavor(
-            labels=set(job.labels),
+            labels=job.labels,
             routing_table=routing_table,
         )
     except _InvalidLabelCombinationError as e:
@@ -127,11 +128,11 @@ class _InvalidLabelCombinationError(Exception):
     """The label combination is invalid."""
 
 
-def _labels_to_flavor(labels: set[str], routing_table: RoutingTable) -> Flavor:
+def _labels_to_flavor(labels: Collection[str], routing_table: RoutingTable) -> Flavor:
     """Map the labels to a flavor.
 
     Args:
-        labels: The labels to map.
+        labels: The lowercase labels to map.
         routing_table: The available flavors.
 
     Raises:
@@ -140,11 +141,10 @@ def _labels_to_flavor(labels: set[str], routing_table: RoutingTable) -> Flavor:
     Returns:
         The flavor.
     """
-    labels_lowered = {label.lower() for label in labels}
-    if not labels_lowered:
+    if not labels:
         return routing_table.default_flavor
 
-    label_key = tuple(sorted(labels_lowered))
+    label_key = tuple(sorted(labels))
     if label_key not in routing_table.value:
         raise _InvalidLabelCombinationError(f"Invalid label combination: {labels}")
     return routing_table.value[label_key]